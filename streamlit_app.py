@@ -144,7 +144,12 @@ def hitung_umur(tgl_lahir):
     umur_bulan = tahun * 12 + bulan
     return tahun, bulan, hari, umur_bulan
 
-# Load LMS WHO (5–19 th)
+# Urutan kategori status & gender (dipakai perhitungan massal dan dashboard)
+STATUS_ORDER = ["Severely Stunted", "Stunted", "Normal", "Tall", "Very Tall"]
+GENDER_ORDER = ["Laki-laki", "Perempuan"]
+
+# Load LMS WHO (5–19 th) — di-cache agar Excel tidak dibaca ulang tiap rerun
+@st.cache_data
 def load_lms(gender):
     if gender == "Laki-laki":
         df = pd.read_excel("data/hfa-boy-z.xlsx")
@@ -153,25 +158,43 @@ def load_lms(gender):
     df = df.rename(columns={"Month": "UmurBulan"})
     return df
 
-# Hitung z-score HFA (5–19 th)
-def hitung_zscore(umur_bulan, tinggi, gender):
+# Tabel LMS per bulan (interpolasi linear), di-cache per gender
+@st.cache_data
+def lms_per_bulan(gender):
     lms_df = load_lms(gender)
-    lms_df = lms_df.set_index("UmurBulan").reindex(
+    return lms_df.set_index("UmurBulan").reindex(
         range(lms_df["UmurBulan"].min(), lms_df["UmurBulan"].max() + 1)
     ).interpolate(method='linear')
 
-    # Clip umur_bulan agar tidak keluar dari range LMS
-    umur_bulan = max(min(umur_bulan, lms_df.index.max()), lms_df.index.min())
+# Hitung z-score HFA massal (array umur/tinggi/gender sekaligus)
+def hitung_zscore_massal(umur_bulan, tinggi, gender):
+    umur_bulan = np.asarray(umur_bulan)
+    tinggi = np.asarray(tinggi, dtype=float)
+    gender = np.asarray(gender)
+    z = np.full(len(tinggi), np.nan)
+
+    for g in GENDER_ORDER:
+        pilih = gender == g
+        if not pilih.any():
+            continue
+        lms_df = lms_per_bulan(g)
+
+        # Clip umur_bulan agar tidak keluar dari range LMS
+        umur = np.clip(umur_bulan[pilih], lms_df.index.min(), lms_df.index.max())
+        baris = lms_df.loc[umur]
+        L = baris["L"].to_numpy(dtype=float)
+        M = baris["M"].to_numpy(dtype=float)
+        S = baris["S"].to_numpy(dtype=float)
+        t = tinggi[pilih]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z[pilih] = np.where(L == 0, np.log(t / M) / S, ((t / M) ** L - 1) / (L * S))
+    return np.round(z, 2)
 
-    L = float(lms_df.loc[umur_bulan, "L"])
-    M = float(lms_df.loc[umur_bulan, "M"])
-    S = float(lms_df.loc[umur_bulan, "S"])
-
-    if L == 0:
-        z = np.log(tinggi / M) / S
-    else:
-        z = ((tinggi / M) ** L - 1) / (L * S)
-    return round(z, 2)
+# Hitung z-score HFA (5–19 th)
+def hitung_zscore(umur_bulan, tinggi, gender):
+    z = hitung_zscore_massal([umur_bulan], [tinggi], [gender])[0]
+    return None if np.isnan(z) else z
 
 # Klasifikasi WHO (HFA)
 def klasifikasi_hfa(z):
@@ -197,6 +220,7 @@ avatar_map = {
 }
 
 # Load Percentile
+@st.cache_data
 def load_percentile(gender):
     if gender == "Laki-laki":
         df = pd.read_excel("data/perc-boy.xlsx")
@@ -205,23 +229,114 @@ def load_percentile(gender):
     df = df.rename(columns={"Month": "UmurBulan"})
     return df
 
-# Hitung persentil
-def hitung_percentil(umur_bulan, tinggi, gender):
+# Tabel persentil per bulan (interpolasi linear), di-cache per gender
+@st.cache_data
+def percentil_per_bulan(gender):
     df = load_percentile(gender)
-    df_interp = df.set_index("UmurBulan").reindex(
+    return df.set_index("UmurBulan").reindex(
         range(df["UmurBulan"].min(), df["UmurBulan"].max() + 1)
     ).interpolate(method='linear')
 
-    umur_bulan = max(min(umur_bulan, df_interp.index.max()), df_interp.index.min())
+# Hitung persentil massal — interpolasi linear per baris seperti np.interp
+def hitung_percentil_massal(umur_bulan, tinggi, gender):
+    umur_bulan = np.asarray(umur_bulan)
+    tinggi = np.asarray(tinggi, dtype=float)
+    gender = np.asarray(gender)
+    percentil = np.full(len(tinggi), np.nan)
+
+    for g in GENDER_ORDER:
+        pilih = gender == g
+        if not pilih.any():
+            continue
+        df_interp = percentil_per_bulan(g)
+        persentil_cols = [c for c in df_interp.columns if c.startswith("P")]
+        percentil_angka = np.array([float(c[1:]) for c in persentil_cols])
+
+        umur = np.clip(umur_bulan[pilih], df_interp.index.min(), df_interp.index.max())
+        tabel = df_interp.loc[umur, persentil_cols].to_numpy(dtype=float)
+        t = tinggi[pilih]
+
+        # Cari segmen kurva tempat tinggi anak berada, lalu interpolasi
+        idx = np.clip((tabel <= t[:, None]).sum(axis=1), 1, len(persentil_cols) - 1)
+        baris = np.arange(len(t))
+        x0, x1 = tabel[baris, idx - 1], tabel[baris, idx]
+        p0, p1 = percentil_angka[idx - 1], percentil_angka[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.clip((t - x0) / (x1 - x0), 0, 1)
+        percentil[pilih] = p0 + frac * (p1 - p0)
+    return np.round(percentil, 1)
 
-    data = df_interp.loc[umur_bulan]
-    persentil_cols = [c for c in df.columns if c.startswith("P")]
-    tinggi_list = [data[col] for col in persentil_cols]
-    percentil_angka = [float(c[1:]) for c in persentil_cols]
+# Hitung persentil
+def hitung_percentil(umur_bulan, tinggi, gender):
+    return hitung_percentil_massal([umur_bulan], [tinggi], [gender])[0]
+
+# =====================================================
+# Validasi Data (kualitas input, massal)
+# =====================================================
+
+# WHO: |HAZ| > 6 dianggap nilai tidak masuk akal secara biologis (BIV)
+BATAS_BIV_HAZ = 6
+UMUR_MIN_BULAN = 61
+UMUR_MAKS_BULAN = 228
+# Rentang input yang sama dengan st.number_input pada form
+TINGGI_MIN, TINGGI_MAKS = 50.0, 200.0
+BERAT_MIN, BERAT_MAKS = 5.0, 100.0
+
+# Hitung umur massal (bulan penuh, setara hitung_umur)
+def hitung_umur_massal(tgl_lahir):
+    tgl_lahir = pd.to_datetime(tgl_lahir)
+    today = pd.Timestamp(datetime.date.today())
+    bulan = (today.year - tgl_lahir.dt.year) * 12 + (today.month - tgl_lahir.dt.month)
+    return bulan - (today.day < tgl_lahir.dt.day).astype(int)
+
+# Klasifikasi WHO (HFA) massal — batas sama dengan klasifikasi_hfa
+def klasifikasi_hfa_massal(z):
+    z = np.asarray(z, dtype=float)
+    return np.select(
+        [z < -3, z < -2, z <= 2, z <= 3],
+        STATUS_ORDER[:4],
+        default=STATUS_ORDER[4],
+    )
 
-    # Interpolasi agar lebih akurat
-    percentil = np.interp(tinggi, tinggi_list, percentil_angka)
-    return round(percentil, 1)
+# Hash nama + tanggal lahir + pengukuran untuk deteksi data ganda
+def kunci_duplikat(df):
+    kunci = pd.DataFrame({
+        "nama": df["Nama Anak"].fillna("").astype(str).str.strip().str.lower(),
+        "lahir": pd.to_datetime(df["Tanggal Lahir"], errors="coerce").dt.strftime("%Y-%m-%d"),
+        # Cast ke float: int64 20 dan float64 20.0 menghasilkan hash berbeda
+        "tinggi": pd.to_numeric(df["Tinggi Badan (cm)"], errors="coerce").astype(float).round(1),
+        "berat": pd.to_numeric(df["Berat Badan (kg)"], errors="coerce").astype(float).round(1),
+    })
+    return pd.util.hash_pandas_object(kunci, index=False)
+
+# Tandai BIV, ketidaksesuaian umur, dan data ganda (termasuk terhadap hash_tersimpan)
+def validasi_data(df, hash_tersimpan=None):
+    z = pd.to_numeric(df["Z-score"], errors="coerce")
+    umur = pd.to_numeric(df["Umur (bulan)"], errors="coerce")
+
+    kunci = kunci_duplikat(df)
+    duplikat = kunci.duplicated(keep="first")
+    if hash_tersimpan:
+        duplikat |= kunci.isin(hash_tersimpan)
+
+    flag = pd.DataFrame(index=df.index)
+    flag["Flag BIV"] = (z.abs() > BATAS_BIV_HAZ).to_numpy()
+    flag["Flag Umur"] = np.select(
+        [umur < UMUR_MIN_BULAN, umur > UMUR_MAKS_BULAN],
+        ["Di bawah 5 tahun", "Di atas 19 tahun"],
+        default="",
+    )
+    flag["Duplikat"] = duplikat.to_numpy()
+    # Umur <= 0 (termasuk tanggal lahir di masa depan) atau ukuran di luar rentang form
+    tinggi = pd.to_numeric(df["Tinggi Badan (cm)"], errors="coerce")
+    berat = pd.to_numeric(df["Berat Badan (kg)"], errors="coerce")
+    flag["Flag Rentang"] = (
+        ~(umur > 0)
+        | ~tinggi.between(TINGGI_MIN, TINGGI_MAKS)
+        | ~berat.between(BERAT_MIN, BERAT_MAKS)
+    ).to_numpy()
+    flag["Valid"] = ~(flag["Flag BIV"] | flag["Duplikat"] | flag["Flag Rentang"])
+    return flag, kunci
 
 # PDF report
 def buat_pdf(data, gender):
@@ -364,9 +479,143 @@ def deteksi_0_5_section():
         st.pyplot(fig)
         st.markdown("</div>", unsafe_allow_html=True)
 
+# =====================================================
+# State sesi & cache render (5–19 tahun)
+# =====================================================
+
+WARNA_ZSCORE = {
+    "Severely Stunted": "#ef476f",
+    "Stunted": "#f78c6b",
+    "Normal": "#06d6a0",
+    "Tall": "#118ab2",
+    "Very Tall": "#9b5de5"
+}
+
+def init_state_5_19():
+    if "data_anak" not in st.session_state:
+        st.session_state.data_anak = []
+    # Versi data naik setiap ada anak baru; dipakai sebagai kunci cache render
+    if "data_versi" not in st.session_state:
+        st.session_state.data_versi = 0
+    # Rekap yang diperbarui bertahap (tanpa groupby ulang seluruh data)
+    if "rekap_status" not in st.session_state:
+        st.session_state.rekap_status = {}
+    if "rekap_zscore" not in st.session_state:
+        st.session_state.rekap_zscore = {}
+    if "rekap_umur" not in st.session_state:
+        st.session_state.rekap_umur = {}
+    if "cache_render" not in st.session_state:
+        st.session_state.cache_render = {}
+    if "hasil_terakhir" not in st.session_state:
+        st.session_state.hasil_terakhir = None
+    # Hash data yang sudah tersimpan, untuk deteksi data ganda
+    if "hash_anak" not in st.session_state:
+        st.session_state.hash_anak = set()
+
+# Simpan satu anak + perbarui rekap dashboard secara inkremental
+def tambah_data_anak(hasil_data, kunci_hash):
+    st.session_state.data_anak.append(hasil_data)
+    st.session_state.hash_anak.add(int(kunci_hash))
+
+    kunci = (hasil_data["Status"], hasil_data["Jenis Kelamin"])
+    rekap_status = st.session_state.rekap_status
+    rekap_status[kunci] = rekap_status.get(kunci, 0) + 1
+
+    z = hasil_data["Z-score"]
+    rekap_zscore = st.session_state.rekap_zscore
+    rekap_zscore[z] = rekap_zscore.get(z, 0) + 1
+
+    catatan = hasil_data["Catatan Validasi"]
+    rekap_umur = st.session_state.rekap_umur
+    rekap_umur[catatan] = rekap_umur.get(catatan, 0) + 1
+
+    st.session_state.data_versi += 1
+
+# Ambil output dari cache sesi; dibuat ulang hanya jika versi data (atau kunci) berubah
+def ambil_render(nama, buat, kunci=None):
+    versi = (st.session_state.data_versi, kunci)
+    tersimpan = st.session_state.cache_render.get(nama)
+    if tersimpan is None or tersimpan[0] != versi:
+        tersimpan = (versi, buat())
+        st.session_state.cache_render[nama] = tersimpan
+    return tersimpan[1]
+
+# Render figure ke PNG agar bisa disimpan di cache (figure langsung ditutup)
+def fig_ke_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+def grafik_kurva_anak(umur_bulan, tinggi, gender):
+    df_percentil = load_percentile(gender)
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for col in ["P3","P15","P50","P85","P97"]:
+        ax.plot(df_percentil["UmurBulan"], df_percentil[col], label=col)
+    ax.scatter([umur_bulan], [tinggi], zorder=5, label="Anak Anda")
+    ax.set_title(f"Kurva Pertumbuhan ({gender})")
+    ax.set_xlabel("Umur (bulan)")
+    ax.set_ylabel("Tinggi (cm)")
+    ax.legend()
+    return fig_ke_png(fig)
+
+def grafik_status_gender(rekap_status):
+    jumlah = {
+        g: [rekap_status.get((s, g), 0) for s in STATUS_ORDER]
+        for g in GENDER_ORDER
+    }
+
+    x = np.arange(len(STATUS_ORDER))
+    width = 0.35
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(x - width/2, jumlah["Laki-laki"], width, label="Laki-laki")
+    ax.bar(x + width/2, jumlah["Perempuan"], width, label="Perempuan")
+    ax.set_ylabel("Jumlah Anak")
+    ax.set_xlabel("Kategori Status")
+    ax.set_title("Distribusi Status Gizi Berdasarkan Gender")
+    ax.set_xticks(x)
+    ax.set_xticklabels(STATUS_ORDER, rotation=20)
+    ax.legend()
+    for i in range(len(STATUS_ORDER)):
+        ax.text(x[i] - width/2, jumlah["Laki-laki"][i] + 0.05,
+                jumlah["Laki-laki"][i], ha="center", va="bottom", fontsize=9)
+        ax.text(x[i] + width/2, jumlah["Perempuan"][i] + 0.05,
+                jumlah["Perempuan"][i], ha="center", va="bottom", fontsize=9)
+    return fig_ke_png(fig)
+
+def grafik_zscore(rekap_zscore):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for z, n in sorted(rekap_zscore.items()):
+        kategori = klasifikasi_hfa(z)[0]
+        ax.bar(z, n, color=WARNA_ZSCORE[kategori], width=0.15)
+    ax.axvline(x=-3, linestyle="--", label="Batas Severe (-3)")
+    ax.axvline(x=-2, linestyle="--", label="Batas Stunted (-2)")
+    ax.axvline(x=2, linestyle="--", label="Batas Normal/Tinggi (+2)")
+    ax.axvline(x=3, linestyle="--", label="Batas Sangat Tinggi (+3)")
+    ax.set_xlabel("Z-score"); ax.set_ylabel("Jumlah Anak"); ax.set_title("Distribusi Z-score Anak")
+    ax.legend()
+    return fig_ke_png(fig)
+
+def kategori_percentil(percentil_value):
+    if percentil_value is None:
+        return None
+    if percentil_value < 3:
+        return "Sangat Pendek"
+    elif percentil_value < 15:
+        return "Pendek"
+    elif percentil_value <= 85:
+        return "Normal"
+    elif percentil_value <= 97:
+        return "Tinggi"
+    else:
+        return "Sangat Tinggi"
+
 # =====================================================
 # Deteksi 5–19 Tahun (UI + logika singkat dari kode awal)
 # =====================================================
+# Halaman dibagi menjadi fragment: submit form hanya menjalankan ulang panel
+# hasil (beserta dashboard & ekspor di dalamnya), bukan seluruh script.
+# Ekspor dan roster adalah fragment mandiri yang dijalankan ulang sendiri.
 
 def deteksi_5_19_section():
     st.markdown("""
@@ -376,6 +625,12 @@ def deteksi_5_19_section():
         </div>
     """, unsafe_allow_html=True)
 
+    init_state_5_19()
+    roster_5_19()
+    panel_hasil_5_19()
+
+@st.fragment
+def panel_hasil_5_19():
     with st.form("form_anak_5_19"):
         c1, c2, c3 = st.columns(3)
         with c1:
@@ -385,19 +640,14 @@ def deteksi_5_19_section():
                                       max_value=datetime.date.today())
         with c2:
             gender = st.selectbox("Jenis Kelamin", ["Laki-laki", "Perempuan"])
-            tinggi = st.number_input("Tinggi Badan (cm)", min_value=50.0, max_value=200.0)
+            tinggi = st.number_input("Tinggi Badan (cm)", min_value=TINGGI_MIN, max_value=TINGGI_MAKS)
         with c3:
-            berat = st.number_input("Berat Badan (kg)", min_value=5.0, max_value=100.0)
+            berat = st.number_input("Berat Badan (kg)", min_value=BERAT_MIN, max_value=BERAT_MAKS)
             kelas = st.text_input("Kelas")
         submit = st.form_submit_button("🔎 Deteksi")
 
-    if "data_anak" not in st.session_state:
-        st.session_state.data_anak = []
-
     if submit:
         tahun, bulan, hari, umur_bulan = hitung_umur(tgl_lahir)
-        if umur_bulan < 61:
-            st.warning("⚠️ Anak berusia di bawah 5 tahun. Gunakan standar WHO 2006 untuk hasil yang lebih tepat.")
 
         z = hitung_zscore(umur_bulan, tinggi, gender)
         if z is None:
@@ -405,36 +655,6 @@ def deteksi_5_19_section():
             return
         status, warna, tips = klasifikasi_hfa(z)
         percentil_value = hitung_percentil(umur_bulan, tinggi, gender)
-        kategori_percentil = None
-        if percentil_value is not None:
-            if percentil_value < 3:
-                kategori_percentil = "Sangat Pendek"
-            elif percentil_value < 15:
-                kategori_percentil = "Pendek"
-            elif percentil_value <= 85:
-                kategori_percentil = "Normal"
-            elif percentil_value <= 97:
-                kategori_percentil = "Tinggi"
-            else:
-                kategori_percentil = "Sangat Tinggi"
-
-        st.subheader("📊 Hasil Analisis")
-        st.markdown(f"**Umur:** {tahun} tahun {bulan} bulan {hari} hari")
-        st.write(f"**Z-score HFA:** {z}")
-        if kategori_percentil:
-            st.write(f"**Persentil Tinggi:** {percentil_value} → {kategori_percentil}")
-            st.write(f"Anak ini lebih tinggi dari {percentil_value}% anak seusianya di dunia.")
-        st.markdown(
-            f"<div class='neumo'><div class='badge'>Status</div><h3 style='margin-top:6px'>{status}</h3><p><i>{tips}</i></p></div>",
-            unsafe_allow_html=True,
-        )
-
-        avatar_key = avatar_map.get(status, "normal_boy")
-        avatar_path = f"avatars/{avatar_key if gender=='Laki-laki' else avatar_key.replace('_boy', '_girl')}.png"
-        if os.path.exists(avatar_path):
-            st.image(avatar_path, width=220, caption="Gambaran Anak")
-        else:
-            st.info("[Avatar tidak tersedia]")
 
         hasil_data = {
             "Nama Anak": nama,
@@ -448,91 +668,228 @@ def deteksi_5_19_section():
             "Status": status,
             "Persentil": percentil_value if percentil_value else "-"
         }
-        st.session_state.data_anak.append(hasil_data)
 
+        # Data BIV atau ganda tidak ikut disimpan / dihitung di dashboard
+        flag, kunci = validasi_data(pd.DataFrame([hasil_data]), st.session_state.hash_anak)
+        flag = flag.iloc[0]
+        if not flag["Valid"]:
+            # Jangan tampilkan hasil anak sebelumnya di bawah pesan penolakan
+            st.session_state.hasil_terakhir = None
+        if flag["Flag BIV"]:
+            st.error(f"❌ Z-score HFA {z} tidak masuk akal secara biologis (|Z| > {BATAS_BIV_HAZ}). Periksa kembali tinggi badan & tanggal lahir. Data tidak disimpan.")
+        elif flag["Duplikat"]:
+            st.warning("⚠️ Data anak ini sudah pernah dimasukkan (nama, tanggal lahir & pengukuran sama). Data tidak disimpan ulang.")
+        elif flag["Flag Rentang"]:
+            st.error("❌ Umur atau ukuran di luar rentang yang bisa dinilai. Periksa kembali tanggal lahir. Data tidak disimpan.")
+        else:
+            hasil_data["Catatan Validasi"] = flag["Flag Umur"] or "-"
+            tambah_data_anak(hasil_data, kunci.iloc[0])
+
+            try:
+                pdf_path = buat_pdf(hasil_data, gender)
+                with open(pdf_path, "rb") as f:
+                    pdf_bytes = f.read()
+                pdf_nama = os.path.basename(pdf_path)
+            except Exception as e:
+                pdf_bytes, pdf_nama = None, None
+
+            # Hasil disimpan di state agar panel tetap tampil saat fragment dijalankan ulang
+            st.session_state.hasil_terakhir = {
+                "umur_teks": f"{tahun} tahun {bulan} bulan {hari} hari",
+                "flag_umur": flag["Flag Umur"],
+                "z": z,
+                "status": status,
+                "tips": tips,
+                "percentil": percentil_value,
+                "kategori_percentil": kategori_percentil(percentil_value),
+                "gender": gender,
+                "kurva_png": grafik_kurva_anak(umur_bulan, tinggi, gender),
+                "pdf_bytes": pdf_bytes,
+                "pdf_nama": pdf_nama,
+            }
+
+    hasil = st.session_state.hasil_terakhir
+    if hasil:
+        tampilkan_hasil_5_19(hasil)
+
+    if st.session_state.data_anak:
+        dashboard_5_19()
+        ekspor_5_19()
+
+def tampilkan_hasil_5_19(hasil):
+    if hasil["flag_umur"] == "Di bawah 5 tahun":
+        st.warning("⚠️ Anak berusia di bawah 5 tahun. Gunakan standar WHO 2006 untuk hasil yang lebih tepat.")
+    elif hasil["flag_umur"] == "Di atas 19 tahun":
+        st.warning("⚠️ Anak berusia di atas 19 tahun, di luar rentang WHO 2007. Hasil hanya perkiraan.")
+
+    st.subheader("📊 Hasil Analisis")
+    st.markdown(f"**Umur:** {hasil['umur_teks']}")
+    st.write(f"**Z-score HFA:** {hasil['z']}")
+    if hasil["kategori_percentil"]:
+        st.write(f"**Persentil Tinggi:** {hasil['percentil']} → {hasil['kategori_percentil']}")
+        st.write(f"Anak ini lebih tinggi dari {hasil['percentil']}% anak seusianya di dunia.")
+    st.markdown(
+        f"<div class='neumo'><div class='badge'>Status</div><h3 style='margin-top:6px'>{hasil['status']}</h3><p><i>{hasil['tips']}</i></p></div>",
+        unsafe_allow_html=True,
+    )
+
+    avatar_key = avatar_map.get(hasil["status"], "normal_boy")
+    avatar_path = f"avatars/{avatar_key if hasil['gender']=='Laki-laki' else avatar_key.replace('_boy', '_girl')}.png"
+    if os.path.exists(avatar_path):
+        st.image(avatar_path, width=220, caption="Gambaran Anak")
+    else:
+        st.info("[Avatar tidak tersedia]")
+
+    if hasil["pdf_bytes"] is None:
+        st.warning("Gagal membuat PDF. Pastikan folder/izin tersedia.")
+
+    st.image(hasil["kurva_png"], use_container_width=True)
+
+# Kolom wajib untuk roster yang diunggah
+KOLOM_ROSTER = ["Nama Anak", "Tanggal Lahir", "Jenis Kelamin", "Tinggi Badan (cm)", "Berat Badan (kg)", "Kelas"]
+
+def baca_roster(berkas):
+    if berkas.name.lower().endswith(".csv"):
+        roster = pd.read_csv(berkas)
+    else:
+        roster = pd.read_excel(berkas)
+    kurang = [c for c in KOLOM_ROSTER if c not in roster.columns]
+    if kurang:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(kurang)}")
+    return roster
+
+# Format tanggal roster yang diterima (hari dulu, sesuai kebiasaan Indonesia)
+FORMAT_TANGGAL_ROSTER = ["%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S"]
+
+# Parse tiap format secara eksplisit agar format tidak ditebak dari baris pertama
+def parse_tanggal_roster(kolom):
+    if pd.api.types.is_datetime64_any_dtype(kolom):
+        return kolom
+    teks = kolom.astype(str).str.strip()
+    tgl = pd.Series(pd.NaT, index=kolom.index, dtype="datetime64[ns]")
+    for fmt in FORMAT_TANGGAL_ROSTER:
+        tgl = tgl.fillna(pd.to_datetime(teks, format=fmt, errors="coerce"))
+    return tgl
+
+# Skor seluruh roster sekaligus; baris tidak lengkap / tanggal tak terbaca dilewati
+def skor_roster(roster):
+    tgl_lahir = parse_tanggal_roster(roster["Tanggal Lahir"])
+    tanggal_kosong = roster["Tanggal Lahir"].isna() | (roster["Tanggal Lahir"].astype(str).str.strip() == "")
+    tanggal_salah = tgl_lahir.isna() & ~tanggal_kosong
+    df = pd.DataFrame({
+        "Nama Anak": roster["Nama Anak"].fillna("").astype(str).str.strip(),
+        "Tanggal Lahir": tgl_lahir.dt.strftime("%Y-%m-%d"),
+        "Jenis Kelamin": roster["Jenis Kelamin"].astype(str).str.strip().replace({"L": "Laki-laki", "P": "Perempuan"}),
+        "Umur (bulan)": hitung_umur_massal(tgl_lahir),
+        "Tinggi Badan (cm)": pd.to_numeric(roster["Tinggi Badan (cm)"], errors="coerce"),
+        "Berat Badan (kg)": pd.to_numeric(roster["Berat Badan (kg)"], errors="coerce"),
+        "Kelas": roster["Kelas"].fillna("").astype(str),
+    })
+    lengkap = (
+        ~tanggal_kosong
+        & df["Tinggi Badan (cm)"].notna()
+        & df["Berat Badan (kg)"].notna()
+        & df["Jenis Kelamin"].isin(GENDER_ORDER)
+    )
+    df = df[lengkap & ~tanggal_salah].reset_index(drop=True)
+    df["Umur (bulan)"] = df["Umur (bulan)"].astype(int)
+
+    z = hitung_zscore_massal(df["Umur (bulan)"], df["Tinggi Badan (cm)"], df["Jenis Kelamin"])
+    percentil = hitung_percentil_massal(df["Umur (bulan)"], df["Tinggi Badan (cm)"], df["Jenis Kelamin"])
+    df["Z-score"] = z
+    df["Status"] = klasifikasi_hfa_massal(z)
+    df["Persentil"] = pd.Series(percentil, dtype=object).where(percentil != 0, "-")
+    return df, int((~lengkap).sum()), int((lengkap & tanggal_salah).sum())
+
+# Baca, skor & validasi roster sekaligus (hasilnya di-cache per berkas + versi data)
+def proses_roster(berkas):
+    df, tidak_lengkap, tanggal_salah = skor_roster(baca_roster(berkas))
+    flag, kunci = validasi_data(df, st.session_state.hash_anak)
+    return {
+        "df": df,
+        "flag": flag,
+        "kunci": kunci,
+        "tabel": pd.concat([df, flag], axis=1),
+        "tidak_lengkap": tidak_lengkap,
+        "tanggal_salah": tanggal_salah,
+    }
+
+# Fragment terpisah: widget roster tidak menjalankan ulang panel form, dan
+# submit form tidak membaca ulang roster
+@st.fragment
+def roster_5_19():
+    with st.expander("📂 Unggah Roster Kelas (CSV/Excel)"):
+        pesan = st.session_state.pop("pesan_roster", None)
+        if pesan:
+            st.success(pesan)
+
+        st.caption(f"Kolom wajib: {', '.join(KOLOM_ROSTER)}. Tanggal Lahir ditulis dd/mm/yyyy (contoh 15/02/2015) atau yyyy-mm-dd. Jenis Kelamin diisi Laki-laki/Perempuan (atau L/P).")
+        berkas = st.file_uploader("Pilih berkas roster", type=["csv", "xlsx"], key="roster_5_19")
+        if berkas is None:
+            return
         try:
-            pdf_path = buat_pdf(hasil_data, gender)
-            with open(pdf_path, "rb") as f:
-                st.download_button("📥 Download PDF Hasil Anak Ini", f, file_name=os.path.basename(pdf_path))
+            hasil = ambil_render("roster", lambda: proses_roster(berkas), kunci=berkas.file_id)
         except Exception as e:
-            st.warning("Gagal membuat PDF. Pastikan folder/izin tersedia.")
-
-        df_percentil = load_percentile(gender)
-        plt.figure(figsize=(8,5))
-        for col in ["P3","P15","P50","P85","P97"]:
-            plt.plot(df_percentil["UmurBulan"], df_percentil[col], label=col)
-        plt.scatter([umur_bulan], [tinggi], zorder=5, label="Anak Anda")
-        plt.title(f"Kurva Pertumbuhan ({gender})")
-        plt.xlabel("Umur (bulan)")
-        plt.ylabel("Tinggi (cm)")
-        plt.legend()
-        st.pyplot(plt)
+            st.warning(f"Roster tidak dapat dibaca. {e}")
+            return
 
-    if st.session_state.data_anak:
-        st.subheader("📋 Data Semua Anak yang Sudah Diperiksa")
-        df_all = pd.DataFrame(st.session_state.data_anak)
-        st.dataframe(df_all, use_container_width=True)
-
-        csv = df_all.to_csv(index=False).encode("utf-8")
-        st.download_button("📥 Download Semua Data (CSV)", csv, file_name="data_semua_anak.csv", mime="text/csv")
-
-        st.subheader("📊 Distribusi Status Gizi Berdasarkan Gender")
-        status_order = ["Severely Stunted", "Stunted", "Normal", "Tall", "Very Tall"]
-        gender_order = ["Laki-laki", "Perempuan"]
-
-        df_counts = df_all.groupby(["Status", "Jenis Kelamin"]).size().unstack(fill_value=0)
-        df_counts = df_counts.reindex(index=status_order, columns=gender_order, fill_value=0)
-
-        x = np.arange(len(status_order))
-        width = 0.35
-        fig, ax = plt.subplots(figsize=(8, 5))
-        ax.bar(x - width/2, df_counts["Laki-laki"], width, label="Laki-laki")
-        ax.bar(x + width/2, df_counts["Perempuan"], width, label="Perempuan")
-        ax.set_ylabel("Jumlah Anak")
-        ax.set_xlabel("Kategori Status")
-        ax.set_title("Distribusi Status Gizi Berdasarkan Gender")
-        ax.set_xticks(x)
-        ax.set_xticklabels(status_order, rotation=20)
-        ax.legend()
-        for i in range(len(status_order)):
-            ax.text(x[i] - width/2, df_counts["Laki-laki"].iloc[i] + 0.05,
-                    int(df_counts["Laki-laki"].iloc[i]), ha="center", va="bottom", fontsize=9)
-            ax.text(x[i] + width/2, df_counts["Perempuan"].iloc[i] + 0.05,
-                    int(df_counts["Perempuan"].iloc[i]), ha="center", va="bottom", fontsize=9)
-        st.pyplot(fig)
+        df, flag, kunci = hasil["df"], hasil["flag"], hasil["kunci"]
+        if hasil["tidak_lengkap"]:
+            st.warning(f"{hasil['tidak_lengkap']} baris dilewati karena data tidak lengkap atau tidak terbaca.")
+        if hasil["tanggal_salah"]:
+            st.warning(f"{hasil['tanggal_salah']} baris dilewati karena Tanggal Lahir tidak sesuai format dd/mm/yyyy atau yyyy-mm-dd.")
+        st.dataframe(hasil["tabel"], use_container_width=True)
+
+        valid = flag["Valid"].to_numpy()
+        st.write(
+            f"**Valid:** {int(valid.sum())} · **Di luar rentang:** {int(flag['Flag Rentang'].sum())} · "
+            f"**BIV:** {int(flag['Flag BIV'].sum())} · "
+            f"**Duplikat:** {int(flag['Duplikat'].sum())} · **Cek umur:** {int((flag['Flag Umur'] != '').sum())}"
+        )
+        if valid.any() and st.button("➕ Simpan data valid", key="simpan_roster"):
+            simpan = df[valid].assign(**{"Catatan Validasi": flag["Flag Umur"][valid].replace("", "-")})
+            for hasil_data, k in zip(simpan.to_dict("records"), kunci.to_numpy()[valid]):
+                tambah_data_anak(hasil_data, k)
+            st.session_state.pesan_roster = f"{int(valid.sum())} data anak dari roster berhasil disimpan."
+            # Rerun seluruh app agar dashboard di panel hasil ikut diperbarui
+            st.rerun()
+
+# Bukan fragment: tanpa widget sendiri, hanya dijalankan ulang oleh panel hasil.
+# Biaya rendahnya berasal dari cache ambil_render per versi data.
+def dashboard_5_19():
+    st.subheader("📋 Data Semua Anak yang Sudah Diperiksa")
+    df_all = ambil_render("tabel", lambda: pd.DataFrame(st.session_state.data_anak))
+    st.dataframe(df_all, use_container_width=True)
+
+    rekap_umur = st.session_state.rekap_umur
+    st.caption(
+        f"Cek umur: {rekap_umur.get('Di bawah 5 tahun', 0)} anak di bawah 5 tahun · "
+        f"{rekap_umur.get('Di atas 19 tahun', 0)} anak di atas 19 tahun (di luar rentang WHO 2007)"
+    )
 
-        st.subheader("📈 Distribusi Z-score dengan Kategori Warna")
-        def kategori_zscore(z):
-            if z < -3:
-                return "Severely Stunted"
-            elif -3 <= z < -2:
-                return "Stunted"
-            elif -2 <= z <= 2:
-                return "Normal"
-            elif 2 < z <= 3:
-                return "Tall"
-            else:
-                return "Very Tall"
-
-        color_map = {
-            "Severely Stunted": "#ef476f",
-            "Stunted": "#f78c6b",
-            "Normal": "#06d6a0",
-            "Tall": "#118ab2",
-            "Very Tall": "#9b5de5"
-        }
-        df_all["Kategori Z-score"] = df_all["Z-score"].apply(kategori_zscore)
-        df_zscore_counts = df_all.groupby(["Z-score", "Kategori Z-score"]).size().reset_index(name="Jumlah")
-        fig2, ax2 = plt.subplots(figsize=(8, 5))
-        for idx, row in df_zscore_counts.iterrows():
-            ax2.bar(row["Z-score"], row["Jumlah"], color=color_map[row["Kategori Z-score"]], width=0.15)
-        ax2.axvline(x=-3, linestyle="--", label="Batas Severe (-3)")
-        ax2.axvline(x=-2, linestyle="--", label="Batas Stunted (-2)")
-        ax2.axvline(x=2, linestyle="--", label="Batas Normal/Tinggi (+2)")
-        ax2.axvline(x=3, linestyle="--", label="Batas Sangat Tinggi (+3)")
-        ax2.set_xlabel("Z-score"); ax2.set_ylabel("Jumlah Anak"); ax2.set_title("Distribusi Z-score Anak")
-        ax2.legend()
-        st.pyplot(fig2)
+    st.subheader("📊 Distribusi Status Gizi Berdasarkan Gender")
+    st.image(
+        ambil_render("status_gender", lambda: grafik_status_gender(st.session_state.rekap_status)),
+        use_container_width=True,
+    )
+
+    st.subheader("📈 Distribusi Z-score dengan Kategori Warna")
+    st.image(
+        ambil_render("zscore", lambda: grafik_zscore(st.session_state.rekap_zscore)),
+        use_container_width=True,
+    )
+
+@st.fragment
+def ekspor_5_19():
+    hasil = st.session_state.hasil_terakhir
+    if hasil and hasil["pdf_bytes"] is not None:
+        st.download_button("📥 Download PDF Hasil Anak Ini", hasil["pdf_bytes"], file_name=hasil["pdf_nama"])
+
+    csv = ambil_render(
+        "csv",
+        lambda: pd.DataFrame(st.session_state.data_anak).to_csv(index=False).encode("utf-8"),
+    )
+    st.download_button("📥 Download Semua Data (CSV)", csv, file_name="data_semua_anak.csv", mime="text/csv")
 
 # =====================================================
 # Halaman: Standar yang Digunakan (konten informatif ringan)